@@ -2,7 +2,7 @@
 """複数会議のC2-Graph矛盾検出結果を集計するスクリプト。
 
 Usage:
-    c2_batch_report.py <input_dir> [--output <file>]
+    c2_batch_report.py <input_dir> [--output <file>] [--workers <n>] [--cache-dir <dir>]
 
 - input_dir 以下の *.json を対象に `c2_graph_baseline.analyse_meeting` を実行
 - 各会議の矛盾検出結果と指標サマリをMarkdown形式で出力
@@ -11,8 +11,15 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+from collections import Counter
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
 
 import sys
 
@@ -31,7 +38,127 @@ except ModuleNotFoundError:
 
 
 def gather_json_files(input_dir: Path) -> List[Path]:
-    return sorted(p for p in input_dir.glob("*.json") if p.is_file())
+    # DirEntry はディレクトリ読み出し時のファイル種別を保持するため、追加の stat が不要
+    with os.scandir(input_dir) as entries:
+        return sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".json") and entry.is_file()
+        )
+
+
+# 解析結果を左右するモジュール。内容が変われば既存のキャッシュは使わない。
+# 本ファイルも _analyse_path で解析の引数とキャッシュする内容の形を決めているため含める
+_ANALYSIS_MODULES = (
+    "c2_models.py",
+    "c2_graph_baseline.py",
+    "constraint_validator.py",
+    "c2_batch_report.py",
+)
+
+
+@lru_cache(maxsize=None)
+def _analysis_fingerprint() -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for name in _ANALYSIS_MODULES:
+        digest.update((CURRENT_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+def _cache_file(cache_dir: Path, path: Path) -> Path:
+    """解析モジュール・パス・更新時刻・サイズから解析結果キャッシュのファイル名を決める。"""
+    stat = path.stat()
+    key = hashlib.blake2b(
+        f"{_analysis_fingerprint()}:{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"),
+        digest_size=8,
+    ).hexdigest()
+    return cache_dir / f"{key}.pickle"
+
+
+def _load_cache(cache_file: Path) -> Optional[Tuple[Dict[str, object], object]]:
+    """キャッシュを読み出す。存在しない・壊れている場合は None (再解析する)。"""
+    try:
+        baseline_result, constraint_summary = pickle.loads(cache_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 書き込み途中で止まったファイル等。unpickle は EOFError 以外にも
+        # AttributeError / ImportError / IndexError などを送出しうるため、まとめてキャッシュ無しとして扱う
+        return None
+    return baseline_result, constraint_summary
+
+
+def _store_cache(cache_file: Path, payload: Tuple[Dict[str, object], object]) -> None:
+    """一時ファイルに書いてから置き換え、読み手に書き込み途中のファイルを見せない。"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(pickle.dumps(payload))
+        os.replace(tmp_name, cache_file)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+# format_meeting_section / aggregate_metrics が参照する analyse_meeting の結果キー。
+# commitments は発話モデルを保持する履歴を含み pickle の大半を占めるため、ワーカーから返さない
+_REPORT_KEYS = ("meeting_id", "topic", "contradictions", "metrics")
+
+
+def _analyse_path(
+    path: Path, cache_dir: Optional[Path] = None
+) -> Tuple[Path, Dict[str, object], object]:
+    """1会議分の解析をワーカープロセス内で完結させる。
+
+    networkx のグラフはバッチ集計で使わないため構築せず、結果もレポートで参照するキーのみ返す
+    (プロセス間転送とキャッシュが軽くなる)。
+    cache_dir 指定時は未変更ファイルの解析をキャッシュから復元する。
+    """
+    cache_file = _cache_file(cache_dir, path) if cache_dir else None
+    if cache_file is not None:
+        cached = _load_cache(cache_file)
+        if cached is not None:
+            return (path, *cached)
+
+    meeting = baseline.load_meeting(path)
+    result = baseline.analyse_meeting(meeting, with_graph=False)
+    baseline_result = {key: result[key] for key in _REPORT_KEYS}
+    constraint_summary = ConstraintValidator().validate(meeting)
+
+    if cache_file is not None:
+        _store_cache(cache_file, (baseline_result, constraint_summary))
+    return path, baseline_result, constraint_summary
+
+
+def analyse_paths(
+    meeting_paths: List[Path],
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[Tuple[Path, Dict[str, object], object]]:
+    """会議ごとの解析をプロセスプールで並列実行し、入力順に逐次返す。
+
+    workers 省略時は CPU 数。いずれの場合も会議数を上限とし、余分なワーカーは起動しない。
+    """
+    analyse = partial(_analyse_path, cache_dir=cache_dir)
+    workers = min(workers or os.cpu_count() or 1, len(meeting_paths))
+    if workers <= 1:
+        yield from map(analyse, meeting_paths)
+        return
+    # multiprocessing 一式の import は十数msかかるため、並列実行する場合のみ読み込む
+    from concurrent.futures import ProcessPoolExecutor
+
+    # ワーカーあたり4チャンク程度に分け、会議数が少なくても1ワーカーに偏らないようにする。
+    # 投入済みのチャンクは取り消せないため、失敗時に待つ量を抑えるよう上限を 4 件とする
+    chunksize = max(1, min(4, len(meeting_paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            yield from executor.map(analyse, meeting_paths, chunksize=chunksize)
+        except BaseException:
+            # executor.map は全件を投入済みのため、失敗や中断時は未着手分を取り消してから抜け、
+            # with の終了処理 (shutdown(wait=True)) が残りの解析完了を待たないようにする
+            executor.shutdown(cancel_futures=True)
+            raise
 
 
 def format_meeting_section(
@@ -67,15 +194,15 @@ def format_meeting_section(
     if contradictions:
         lines.append("- 検出矛盾:")
         for item in contradictions:
-            suggestion = item.get("suggestion")
+            suggestion = item.suggestion
             suggestion_suffix = f" | 提案: {suggestion}" if suggestion else ""
             lines.append(
                 "  - turn{turn} {cid}: {ctype} ({detail}) 発話者={speaker}{suggestion}".format(
-                    turn=item["turn"],
-                    cid=item["commitment_id"],
-                    ctype=item["type"],
-                    detail=item["detail"],
-                    speaker=item["speaker"],
+                    turn=item.turn,
+                    cid=item.commitment_id,
+                    ctype=item.type,
+                    detail=item.detail,
+                    speaker=item.speaker,
                     suggestion=suggestion_suffix,
                 )
             )
@@ -89,20 +216,20 @@ def aggregate_metrics(
     baseline_results: List[Dict[str, object]],
     constraint_summaries,
 ) -> Dict[str, object]:
-    total_commitments = sum(r["metrics"]["total_commitments"] for r in baseline_results)
-    total_contradictions = sum(r["metrics"]["contradiction_count"] for r in baseline_results)
-    total_contradicted = sum(r["metrics"]["contradicted_commitments"] for r in baseline_results)
-    total_constraint_violations = sum(summary.violation_count for summary in constraint_summaries)
-
-    type_counter: Dict[str, int] = {}
+    total_commitments = total_contradictions = total_contradicted = 0
+    type_counter: Counter = Counter()
     for r in baseline_results:
-        for key, value in r["metrics"]["contradiction_types"].items():
-            type_counter[key] = type_counter.get(key, 0) + value
+        metrics = r["metrics"]
+        total_commitments += metrics["total_commitments"]
+        total_contradictions += metrics["contradiction_count"]
+        total_contradicted += metrics["contradicted_commitments"]
+        type_counter.update(metrics["contradiction_types"])
 
-    cp_status_counts: Dict[str, int] = {}
+    total_constraint_violations = 0
+    cp_status_counts: Counter = Counter()
     for summary in constraint_summaries:
-        for status in summary.cp_status.values():
-            cp_status_counts[status] = cp_status_counts.get(status, 0) + 1
+        total_constraint_violations += summary.violation_count
+        cp_status_counts.update(summary.cp_status.values())
 
     return {
         "meetings": len(baseline_results),
@@ -112,73 +239,109 @@ def aggregate_metrics(
         "contradiction_rate": total_contradicted / total_commitments if total_commitments else 0.0,
         "contradiction_types": dict(sorted(type_counter.items())),
         "constraint_violations": total_constraint_violations,
-        "cp_status_counts": cp_status_counts,
+        "cp_status_counts": dict(cp_status_counts),
     }
 
 
-def render_report(
-    results: List[Tuple[Path, Dict[str, object], object]],
-    aggregate: Dict[str, object],
-) -> str:
-    lines: List[str] = []
-    lines.append("# C2-Graph 矛盾検出バッチレポート")
-    lines.append("")
-    lines.append("## 会議別サマリ")
-    lines.append("")
-    for meeting_path, baseline_result, constraint_summary in results:
-        lines.append(format_meeting_section(meeting_path, baseline_result, constraint_summary))
-    lines.append("## 集計結果")
-    lines.append("")
-    lines.append(f"- 会議数: {aggregate['meetings']}")
-    lines.append(
-        "- コミットメント合計: {total} / 矛盾コミットメント数: {contradicted} / 矛盾率: {rate:.2f}".format(
-            total=aggregate["total_commitments"],
-            contradicted=aggregate["contradicted_commitments"],
-            rate=aggregate["contradiction_rate"],
-        )
+def _render_aggregate_lines(aggregate: Dict[str, object]) -> Iterator[str]:
+    contradiction_types = aggregate["contradiction_types"]
+    cp_status_counts = aggregate["cp_status_counts"]
+    yield "## 集計結果"
+    yield ""
+    yield f"- 会議数: {aggregate['meetings']}"
+    yield "- コミットメント合計: {total} / 矛盾コミットメント数: {contradicted} / 矛盾率: {rate:.2f}".format(
+        total=aggregate["total_commitments"],
+        contradicted=aggregate["contradicted_commitments"],
+        rate=aggregate["contradiction_rate"],
     )
-    lines.append(f"- 矛盾総数: {aggregate['contradiction_count']}")
-    lines.append(f"- 制約違反総数: {aggregate['constraint_violations']}")
-    if aggregate['contradiction_types']:
-        lines.append('- 矛盾タイプ内訳:')
-        for key, value in aggregate['contradiction_types'].items():
-            lines.append(f"  - {key}: {value}")
-    if aggregate['cp_status_counts']:
-        lines.append('- CPステータス集計:')
-        for status, count in aggregate['cp_status_counts'].items():
-            lines.append(f"  - {status}: {count}")
-    return "\n".join(lines)
+    yield f"- 矛盾総数: {aggregate['contradiction_count']}"
+    yield f"- 制約違反総数: {aggregate['constraint_violations']}"
+    if contradiction_types:
+        yield "- 矛盾タイプ内訳:"
+        for key, value in contradiction_types.items():
+            yield f"  - {key}: {value}"
+    if cp_status_counts:
+        yield "- CPステータス集計:"
+        for status, count in cp_status_counts.items():
+            yield f"  - {status}: {count}"
+
+
+def stream_report(
+    results: Iterable[Tuple[Path, Dict[str, object], object]],
+    outputs: Sequence[TextIO],
+) -> Dict[str, object]:
+    """会議別セクションを解析完了順 (入力順) に書き出し、最後に集計結果を追記する。
+
+    集計には会議ごとの指標と制約サマリのみを保持し、セクション文字列は溜め込まない。
+    """
+
+    def write(text: str) -> None:
+        for out in outputs:
+            out.write(text)
+
+    write("# C2-Graph 矛盾検出バッチレポート\n\n## 会議別サマリ\n\n")
+    metrics_results: List[Dict[str, object]] = []
+    constraint_summaries = []
+    for meeting_path, baseline_result, constraint_summary in results:
+        write(format_meeting_section(meeting_path, baseline_result, constraint_summary) + "\n")
+        metrics_results.append({"metrics": baseline_result["metrics"]})
+        constraint_summaries.append(constraint_summary)
+
+    aggregate = aggregate_metrics(metrics_results, constraint_summaries)
+    write("\n".join(_render_aggregate_lines(aggregate)))
+    return aggregate
+
+
+def render_report(results: Iterable[Tuple[Path, Dict[str, object], object]]) -> str:
+    """レポート全体を文字列で返す。書式は stream_report に一本化している。"""
+    buffer = io.StringIO()
+    stream_report(results, (buffer,))
+    return buffer.getvalue()
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="C2-Graph矛盾検出バッチ実行")
     parser.add_argument("input_dir", type=Path)
     parser.add_argument("--output", type=Path)
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        help="並列ワーカー数 (省略時はCPU数、1で逐次実行)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="解析結果キャッシュの保存先 (例: .c2_cache)。未変更の会議JSONは再解析しない",
+    )
     args = parser.parse_args()
 
     meeting_paths = gather_json_files(args.input_dir)
     if not meeting_paths:
         raise SystemExit("入力ディレクトリにJSONファイルがありません")
 
-    validator = ConstraintValidator()
-    results: List = []
-    baseline_results: List[Dict[str, object]] = []
-    constraint_summaries = []
-    for path in meeting_paths:
-        meeting = baseline.load_meeting(path)
-        baseline_result = baseline.analyse_meeting(meeting)
-        constraint_summary = validator.validate(meeting)
-        results.append((path, baseline_result, constraint_summary))
-        baseline_results.append(baseline_result)
-        constraint_summaries.append(constraint_summary)
-
-    aggregate = aggregate_metrics(baseline_results, constraint_summaries)
-    report = render_report(results, aggregate)
+    results = analyse_paths(meeting_paths, workers=args.workers, cache_dir=args.cache_dir)
 
     if args.output:
+        # 途中で解析に失敗しても既存のレポートを壊さないよう、一時ファイルに書き切ってから置き換える
         args.output.parent.mkdir(parents=True, exist_ok=True)
-        args.output.write_text(report, encoding="utf-8")
-    print(report)
+        fd, tmp_name = tempfile.mkstemp(dir=args.output.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                stream_report(results, (sys.stdout, out))
+            os.replace(tmp_name, args.output)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    else:
+        stream_report(results, (sys.stdout,))
+    print()
 
 
 if __name__ == "__main__":
@@ -15,11 +15,9 @@
 from __future__ import annotations
 
 import argparse
-import json
-from collections import Counter
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set
 
 try:
     import networkx as nx
@@ -27,52 +25,54 @@ except ImportError:  # networkxが未インストールでも動作可能にす
     nx = None
 
 try:
-    from .c2_models import MeetingRecord, UtteranceEvent
+    from .c2_models import MeetingRecord, UtteranceEvent, load_meeting_json
 except ImportError:
     import sys
     CURRENT_DIR = Path(__file__).resolve().parent
     if str(CURRENT_DIR) not in sys.path:
         sys.path.append(str(CURRENT_DIR))
-    from c2_models import MeetingRecord, UtteranceEvent
+    from c2_models import MeetingRecord, UtteranceEvent, load_meeting_json
 
-@dataclass
+@dataclass(slots=True)
 class CommitmentState:
     commitment_id: str
     owner: Optional[str] = None
     due: Optional[str] = None
     status: str = "assigned"
-    history: List[dict] = field(default_factory=list)
+    history: List[UtteranceEvent] = field(default_factory=list)
     requires_confirmation: bool = False
 
     def record(self, event: UtteranceEvent) -> None:
-        self.history.append(event.model_dump())
+        # model_dump はフィールド全体を複製するため、参照のみ保持し必要時に展開する
+        self.history.append(event)
 
 
 def load_meeting(path: Path) -> MeetingRecord:
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    return MeetingRecord.model_validate(data)
+    # 話者・act・ID 等の短い文字列は load_meeting_json のパースキャッシュ (cache_strings="all") で重複排除済み
+    return load_meeting_json(path.read_bytes())
 
 
 def build_graph(events: List[UtteranceEvent]):
-    graph = None
-    if nx is not None:
-        graph = nx.DiGraph()
-        for event in events:
-            node = f"commitment:{event.commitment_id}"
-            if event.commitment_id and not graph.has_node(node):
-                graph.add_node(node, type="commitment")
-            speaker_node = f"speaker:{event.speaker}"
-            if not graph.has_node(speaker_node):
-                graph.add_node(speaker_node, type="speaker")
-            if event.commitment_id:
-                graph.add_edge(
-                    speaker_node,
-                    node,
-                    act=event.act,
-                    turn=event.turn,
-                    timestamp=event.timestamp,
-                )
+    if nx is None:
+        return None
+    graph = nx.DiGraph()
+    for event in events:
+        cid = event.commitment_id
+        # コミットメントを持たない発話ではノード名の文字列を組み立てない
+        node = f"commitment:{cid}" if cid else None
+        if node is not None and not graph.has_node(node):
+            graph.add_node(node, type="commitment")
+        speaker_node = f"speaker:{event.speaker}"
+        if not graph.has_node(speaker_node):
+            graph.add_node(speaker_node, type="speaker")
+        if node is not None:
+            graph.add_edge(
+                speaker_node,
+                node,
+                act=event.act,
+                turn=event.turn,
+                timestamp=event.timestamp,
+            )
     return graph
 
 
@@ -91,34 +91,72 @@ def suggest_action(contradiction_type: str) -> str:
     )
 
 
-def analyse_meeting(meeting: MeetingRecord) -> Dict[str, object]:
+CONTRADICTION_TYPES = (
+    "cancel_without_assignment",
+    "unauthorized_cancel",
+    "duplicate_cancel",
+    "cancel_before_confirmation",
+)
+(
+    CANCEL_WITHOUT_ASSIGNMENT,
+    UNAUTHORIZED_CANCEL,
+    DUPLICATE_CANCEL,
+    CANCEL_BEFORE_CONFIRMATION,
+) = range(len(CONTRADICTION_TYPES))
+# type_id -> 提案文 (既定文言へのフォールバックも含めて事前解決しておく)
+_SUGGESTIONS_BY_TYPE_ID = tuple(suggest_action(name) for name in CONTRADICTION_TYPES)
+
+
+class Contradiction(NamedTuple):
+    """検出した矛盾1件。タイプ名と提案文はレンダリング時に type_id から引く。"""
+
+    turn: int
+    commitment_id: str
+    type_id: int
+    speaker: str
+    detail: str
+
+    @property
+    def type(self) -> str:
+        return CONTRADICTION_TYPES[self.type_id]
+
+    @property
+    def suggestion(self) -> str:
+        return _SUGGESTIONS_BY_TYPE_ID[self.type_id]
+
+
+def analyse_meeting(meeting: MeetingRecord, *, with_graph: bool = False) -> Dict[str, object]:
     commitments: Dict[str, CommitmentState] = {}
-    contradictions: List[dict] = []
+    contradictions: List[Contradiction] = []
+    # 指標集計を別パスにしないよう、矛盾の追加と同時に数える
+    type_counts = [0] * len(CONTRADICTION_TYPES)
+    contradicted_cids: Set[str] = set()
+    get_state = commitments.get
 
     for event in meeting.utterances:
-        act = event.act.upper()
         cid = event.commitment_id
         if not cid:
             continue
-        state = commitments.get(cid)
+        # act は UtteranceEvent の Literal で大文字に制約済み
+        act = event.act
+        state = get_state(cid)
+        # 初出時のみ生成して登録し、get/setdefault による二重のハッシュ計算を避ける
+        is_new = state is None
+        if is_new:
+            state = commitments[cid] = CommitmentState(cid)
 
         if act == "ASSIGN":
-            state = commitments.setdefault(cid, CommitmentState(cid))
             state.owner = event.owner or state.owner
             state.due = event.due or state.due
             state.status = "assigned"
             state.requires_confirmation = True
             state.record(event)
         elif act == "CONFIRM":
-            if state is None:
-                state = commitments.setdefault(cid, CommitmentState(cid))
             state.owner = state.owner or event.owner or event.speaker
             state.status = "confirmed"
             state.requires_confirmation = False
             state.record(event)
         elif act == "REVISE":
-            if state is None:
-                state = commitments.setdefault(cid, CommitmentState(cid))
             if event.new_owner:
                 state.owner = event.new_owner
             if event.new_due:
@@ -127,67 +165,53 @@ def analyse_meeting(meeting: MeetingRecord) -> Dict[str, object]:
             state.requires_confirmation = True
             state.record(event)
         elif act == "CANCEL":
-            if state is None:
-                state = commitments.setdefault(cid, CommitmentState(cid))
+            if is_new:
                 state.status = "cancelled"
                 state.requires_confirmation = False
                 state.record(event)
                 contradictions.append(
-                    {
-                        "turn": event.turn,
-                        "commitment_id": cid,
-                        "type": "cancel_without_assignment",
-                        "speaker": event.speaker,
-                        "detail": "ASSIGN前にCANCELが発生",
-                        "suggestion": suggest_action("cancel_without_assignment"),
-                    }
+                    Contradiction(
+                        event.turn, cid, CANCEL_WITHOUT_ASSIGNMENT, event.speaker, "ASSIGN前にCANCELが発生"
+                    )
                 )
+                type_counts[CANCEL_WITHOUT_ASSIGNMENT] += 1
+                contradicted_cids.add(cid)
                 continue
             if state.owner and event.speaker != state.owner:
                 contradictions.append(
-                    {
-                        "turn": event.turn,
-                        "commitment_id": cid,
-                        "type": "unauthorized_cancel",
-                        "speaker": event.speaker,
-                        "detail": f"オーナー({state.owner})以外がCANCEL",
-                        "suggestion": suggest_action("unauthorized_cancel"),
-                    }
+                    Contradiction(
+                        event.turn, cid, UNAUTHORIZED_CANCEL, event.speaker, f"オーナー({state.owner})以外がCANCEL"
+                    )
                 )
+                type_counts[UNAUTHORIZED_CANCEL] += 1
+                contradicted_cids.add(cid)
             elif state.status == "cancelled":
                 contradictions.append(
-                    {
-                        "turn": event.turn,
-                        "commitment_id": cid,
-                        "type": "duplicate_cancel",
-                        "speaker": event.speaker,
-                        "detail": "既にCANCEL済みのコミットメント",
-                        "suggestion": suggest_action("duplicate_cancel"),
-                    }
+                    Contradiction(
+                        event.turn, cid, DUPLICATE_CANCEL, event.speaker, "既にCANCEL済みのコミットメント"
+                    )
                 )
+                type_counts[DUPLICATE_CANCEL] += 1
+                contradicted_cids.add(cid)
             if state.requires_confirmation:
                 contradictions.append(
-                    {
-                        "turn": event.turn,
-                        "commitment_id": cid,
-                        "type": "cancel_before_confirmation",
-                        "speaker": event.speaker,
-                        "detail": "REVISE/ASSIGN の確認前にCANCEL",
-                        "suggestion": suggest_action("cancel_before_confirmation"),
-                    }
+                    Contradiction(
+                        event.turn, cid, CANCEL_BEFORE_CONFIRMATION, event.speaker, "REVISE/ASSIGN の確認前にCANCEL"
+                    )
                 )
+                type_counts[CANCEL_BEFORE_CONFIRMATION] += 1
+                contradicted_cids.add(cid)
             state.status = "cancelled"
             state.requires_confirmation = False
             state.record(event)
         else:
             # 未定義のアクトは履歴に記録した上でスキップ
-            if state is None:
-                state = commitments.setdefault(cid, CommitmentState(cid))
             state.record(event)
 
-    graph = build_graph(meeting.utterances)
+    # グラフは参照する呼び出し元のみ構築する (バッチ集計では未使用)
+    graph = build_graph(meeting.utterances) if with_graph else None
 
-    metrics = summarise_metrics(commitments, contradictions)
+    metrics = summarise_metrics(commitments, contradictions, type_counts, contradicted_cids)
 
     return {
         "meeting_id": meeting.meeting_id,
@@ -199,11 +223,18 @@ def analyse_meeting(meeting: MeetingRecord) -> Dict[str, object]:
     }
 
 
-def summarise_metrics(commitments: Dict[str, CommitmentState], contradictions: List[dict]) -> Dict[str, object]:
+def summarise_metrics(
+    commitments: Dict[str, CommitmentState],
+    contradictions: List[Contradiction],
+    type_counts: List[int],
+    contradicted_cids: Set[str],
+) -> Dict[str, object]:
     total_commitments = len(commitments)
     contradiction_count = len(contradictions)
-    contradicted_commitments = len({c["commitment_id"] for c in contradictions})
-    type_counter = Counter(c["type"] for c in contradictions)
+    contradicted_commitments = len(contradicted_cids)
+    type_counter = {
+        name: count for name, count in zip(CONTRADICTION_TYPES, type_counts) if count
+    }
     contradiction_rate = (
         contradicted_commitments / total_commitments if total_commitments else 0.0
     )
@@ -216,50 +247,49 @@ def summarise_metrics(commitments: Dict[str, CommitmentState], contradictions: L
     }
 
 
-def render_report(result: Dict[str, object]) -> str:
-    lines: List[str] = []
-    lines.append(f"会議ID: {result['meeting_id']}")
-    if result.get("topic"):
-        lines.append(f"トピック: {result['topic']}")
-    lines.append("")
-    lines.append("## コミットメント状態")
+def _render_lines(result: Dict[str, object]) -> Iterator[str]:
+    yield f"会議ID: {result['meeting_id']}"
+    topic = result.get("topic")
+    if topic:
+        yield f"トピック: {topic}"
+    yield ""
+    yield "## コミットメント状態"
     for cid, state in result["commitments"].items():
-        lines.append(
-            f"- {cid}: status={state.status}, owner={state.owner}, due={state.due}, 履歴ターン={len(state.history)}"
-        )
-    lines.append("")
-    lines.append("## 検出された矛盾")
+        yield f"- {cid}: status={state.status}, owner={state.owner}, due={state.due}, 履歴ターン={len(state.history)}"
+    yield ""
+    yield "## 検出された矛盾"
     contradictions = result["contradictions"]
     if not contradictions:
-        lines.append("- 矛盾なし")
+        yield "- 矛盾なし"
     else:
         for item in contradictions:
-            suggestion = item.get("suggestion")
+            suggestion = item.suggestion
             suggestion_suffix = f" | 提案: {suggestion}" if suggestion else ""
-            lines.append(
-                f"- turn{item['turn']} {item['commitment_id']}: {item['type']} ({item['detail']}) 発話者={item['speaker']}{suggestion_suffix}"
-            )
-    lines.append("")
-    lines.append(f"矛盾総数: {len(contradictions)}")
+            yield f"- turn{item.turn} {item.commitment_id}: {item.type} ({item.detail}) 発話者={item.speaker}{suggestion_suffix}"
+    yield ""
+    yield f"矛盾総数: {len(contradictions)}"
 
     metrics = result.get("metrics", {})
     if metrics:
-        lines.append("")
-        lines.append("## 指標サマリ")
-        lines.append(
+        contradiction_types = metrics.get("contradiction_types")
+        yield ""
+        yield "## 指標サマリ"
+        yield (
             f"- コミットメント数: {metrics['total_commitments']}"
             f" / 矛盾検出コミットメント数: {metrics['contradicted_commitments']}"
         )
-        lines.append(
+        yield (
             f"- 矛盾率: {metrics['contradiction_rate']:.2f}"
             f" (矛盾総数: {metrics['contradiction_count']})"
         )
-        if metrics.get("contradiction_types"):
-            lines.append("- 矛盾タイプ内訳:")
-            for key, value in metrics["contradiction_types"].items():
-                lines.append(f"  - {key}: {value}")
+        if contradiction_types:
+            yield "- 矛盾タイプ内訳:"
+            for key, value in contradiction_types.items():
+                yield f"  - {key}: {value}"
 
-    return "\n".join(lines)
+
+def render_report(result: Dict[str, object]) -> str:
+    return "\n".join(_render_lines(result))
 
 
 def main() -> None:
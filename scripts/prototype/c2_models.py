@@ -6,12 +6,61 @@ Pydantic v2 を用いて会議JSONをバリデーションしながら読み込
 from __future__ import annotations
 
 from enum import Enum
-from typing import Dict, Iterable, List, Literal, Optional
-
-from pydantic import BaseModel, Field, field_validator, model_validator
+from operator import attrgetter
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
 
 ActLiteral = Literal["ASSIGN", "CONFIRM", "REVISE", "CANCEL", "OTHER"]
 
+# pydantic-core (Rust) 側で照合させるため Field(pattern=...) として渡す
+TIMESTAMP_PATTERN = r"^\d{2}:\d{2}:\d{2}(\.\d{1,3})?$"
+
+_turn_key = attrgetter("turn")
+
+
+def _ordered_unique(values: List[str]) -> List[str]:
+    """順序を保って重複を除く。参照は1件以下が大半のため、その場合は走査しない。"""
+    if len(values) <= 1:
+        return values
+    return list(dict.fromkeys(values))
+
+
+# 空文字を含む場合はエラーにするため、除外済みリストを作らず `in` (C 実装の走査) で判定する
+def _sanitize_commitment_refs(value: List[str]) -> List[str]:
+    if "" in value:
+        raise ValueError("commitment_refs must not contain empty strings")
+    return _ordered_unique(value)
+
+
+def _sanitize_question_refs(value: List[str]) -> List[str]:
+    if "" in value:
+        raise ValueError("question_refs must not contain empty strings")
+    for ref in value:
+        if not ref.startswith("Q"):
+            raise ValueError("question_refs entries must start with 'Q'")
+    return _ordered_unique(value)
+
+
+def _round_confidence(value: float) -> float:
+    return round(value, 6)
+
+
+# Optional[Annotated[...]] にすることで、値が None の場合は pydantic-core が
+# Python 側の検証関数を呼ばずに済む (field_validator は None でも毎回呼ばれる)
+CommitmentRefs = Annotated[List[str], AfterValidator(_sanitize_commitment_refs)]
+QuestionRefs = Annotated[List[str], AfterValidator(_sanitize_question_refs)]
+Confidence = Annotated[float, Field(ge=0.0, le=1.0), AfterValidator(_round_confidence)]
+
 
 class QuestionStatus(str, Enum):
     OPEN = "open"
@@ -37,7 +86,7 @@ class OpenQuestion(BaseModel):
     raised_turn: Optional[int] = Field(default=None, ge=1)
     resolved_by: Optional[str] = None
     resolved_turn: Optional[int] = Field(default=None, ge=1)
-    commitment_refs: Optional[List[str]] = None
+    commitment_refs: Optional[CommitmentRefs] = None
     notes: Optional[str] = None
 
     @field_validator("question_id")
@@ -47,16 +96,6 @@ class OpenQuestion(BaseModel):
             raise ValueError("question_id must start with 'Q'")
         return value
 
-    @field_validator("commitment_refs")
-    @classmethod
-    def _sanitize_commitment_refs(cls, value: Optional[List[str]]) -> Optional[List[str]]:
-        if value is None:
-            return value
-        filtered = [ref for ref in value if ref]
-        if len(filtered) != len(value):
-            raise ValueError("commitment_refs must not contain empty strings")
-        return list(dict.fromkeys(filtered))
-
     @model_validator(mode="after")
     def _validate_resolution(self) -> "OpenQuestion":
         if self.status == QuestionStatus.RESOLVED:
@@ -65,9 +104,15 @@ class OpenQuestion(BaseModel):
         return self
 
 
-class UtteranceEvent(BaseModel):
+class _UtteranceEventBase(BaseModel):
+    """発話イベントの共通フィールド。
+
+    act ごとの必須項目は下の派生クラスで型として表現する。act の検査が無いため直接は検証に使わず、
+    act を判別子とする UtteranceEvent (派生クラスのユニオン) を通して読み込む。
+    """
+
     turn: int = Field(..., ge=1)
-    timestamp: str = Field(..., pattern=r"^\d{2}:\d{2}:\d{2}(\.\d{1,3})?$")
+    timestamp: str = Field(..., pattern=TIMESTAMP_PATTERN)
     speaker: str
     text: str
     act: ActLiteral
@@ -78,40 +123,68 @@ class UtteranceEvent(BaseModel):
     new_owner: Optional[str] = None
     new_due: Optional[str] = None
     reason: Optional[str] = None
-    question_refs: Optional[List[str]] = None
-    confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    question_refs: Optional[QuestionRefs] = None
+    confidence: Optional[Confidence] = None
     metadata: Optional[dict] = None
 
-    @field_validator("question_refs")
-    @classmethod
-    def _validate_question_refs(cls, value: Optional[List[str]]) -> Optional[List[str]]:
-        if value is None:
-            return value
-        filtered = [ref for ref in value if ref]
-        if len(filtered) != len(value):
-            raise ValueError("question_refs must not contain empty strings")
-        for ref in filtered:
-            if not ref.startswith("Q"):
-                raise ValueError("question_refs entries must start with 'Q'")
-        return list(dict.fromkeys(filtered))
-
-    @field_validator("confidence")
-    @classmethod
-    def _validate_confidence_precision(cls, value: Optional[float]) -> Optional[float]:
-        return None if value is None else round(value, 6)
+
+class AssignEvent(_UtteranceEventBase):
+    act: Literal["ASSIGN"]
+    commitment_id: str = Field(..., min_length=1)
+    owner: str = Field(..., min_length=1)
+
+
+class ConfirmEvent(_UtteranceEventBase):
+    act: Literal["CONFIRM"]
+    commitment_id: str = Field(..., min_length=1)
+
+
+class ReviseEvent(_UtteranceEventBase):
+    act: Literal["REVISE"]
+    commitment_id: str = Field(..., min_length=1)
 
     @model_validator(mode="after")
-    def _validate_relationships(self) -> "UtteranceEvent":
-        if self.act in {"ASSIGN", "CONFIRM", "REVISE", "CANCEL"} and not self.commitment_id:
-            raise ValueError("commitment_id is required for commitment-related acts")
-        if self.act == "ASSIGN" and not self.owner:
-            raise ValueError("ASSIGN requires owner field")
-        if self.act == "REVISE" and not (self.new_owner or self.new_due):
+    def _validate_revision(self) -> "ReviseEvent":
+        if not (self.new_owner or self.new_due):
             raise ValueError("REVISE requires new_owner or new_due")
         return self
 
 
+class CancelEvent(_UtteranceEventBase):
+    act: Literal["CANCEL"]
+    commitment_id: str = Field(..., min_length=1)
+
+
+class OtherEvent(_UtteranceEventBase):
+    act: Literal["OTHER"]
+
+
+# pydantic-core が act を見て派生クラスを直接選ぶ (act 分岐の Python 検証関数を通らない)。
+# UtteranceEvent は型エイリアスでモデルクラスではないため、UtteranceEvent(...) / model_validate / isinstance は使えない。
+# 単体の検証は UTTERANCE_EVENT_ADAPTER.validate_python(...)、型判定は派生クラス
+# (AssignEvent など。act を問わない場合は _UtteranceEventBase) に対して行う
+UtteranceEvent = Annotated[
+    Union[AssignEvent, ConfirmEvent, ReviseEvent, CancelEvent, OtherEvent],
+    Field(discriminator="act"),
+]
+
+# 発話イベント単体の検証用 (例: UTTERANCE_EVENT_ADAPTER.validate_python(payload))
+UTTERANCE_EVENT_ADAPTER: TypeAdapter[UtteranceEvent] = TypeAdapter(UtteranceEvent)
+
+
 class MeetingRecord(BaseModel):
+    """会議1件分の記録。
+
+    open_question_index / commitments の索引は検証時に構築する (utterances の走査は1回)。
+    unique_speakers は参照する呼び出し元が少ないため、初回呼び出し時に求めて保持する。
+    読み込み後に utterances 等を書き換える用途は想定しない。
+    """
+
+    # model_validate_json は 64 byte 以下の文字列を pydantic-core のパースキャッシュで重複排除し、
+    # 同じ値には同じ str オブジェクトを返す (sys.intern ではない)。話者名・コミットメントIDの比較や
+    # dict 参照は多くの場合同一オブジェクト判定で済む。既定値 (True = "all") と同じだが前提として明示する
+    model_config = ConfigDict(cache_strings="all")
+
     meeting_id: str
     topic: Optional[str] = None
     datetime: Optional[str] = None
@@ -119,6 +192,10 @@ class MeetingRecord(BaseModel):
     open_questions: Optional[List[OpenQuestion]] = None
     utterances: List[UtteranceEvent]
 
+    _question_index: Dict[str, OpenQuestion] = PrivateAttr(default_factory=dict)
+    _commitments: Dict[str, List[UtteranceEvent]] = PrivateAttr(default_factory=dict)
+    _speakers: Optional[List[str]] = PrivateAttr(default=None)
+
     @field_validator("open_questions", mode="after")
     @classmethod
     def _sanitize_open_questions(cls, value: Optional[List[OpenQuestion]]) -> Optional[List[OpenQuestion]]:
@@ -133,43 +210,62 @@ class MeetingRecord(BaseModel):
             ordered.append(question)
         return ordered
 
-    @field_validator("utterances", mode="after")
-    @classmethod
-    def _ensure_sorted(cls, value: Iterable[UtteranceEvent]) -> List[UtteranceEvent]:
-        return sorted(list(value), key=lambda ev: ev.turn)
-
-    @model_validator(mode="after")
-    def _validate_question_links(self) -> "MeetingRecord":
-        question_ids = {q.question_id for q in self.open_questions or []}
+    def model_post_init(self, __context: Any) -> None:
+        if self.open_questions:
+            self._question_index = {q.question_id: q for q in self.open_questions}
+        # 通常は turn 順に記述されているため、整列確認と索引構築を同じ走査で行い、
+        # 逆順を検出した場合のみソートしてやり直す
+        if not self._index_utterances():
+            self.utterances.sort(key=_turn_key)
+            self._index_utterances()
+
+    def _index_utterances(self) -> bool:
+        question_index = self._question_index
+        bucket: Dict[str, List[UtteranceEvent]] = {}
+        prev = 0
         for event in self.utterances:
-            if event.question_refs:
-                unknown = [ref for ref in event.question_refs if ref not in question_ids]
-                if unknown:
-                    raise ValueError(
-                        f"Utterance turn {event.turn} references unknown questions: {unknown}"
-                    )
-        return self
+            if event.turn < prev:
+                return False
+            prev = event.turn
+            if event.commitment_id:
+                bucket.setdefault(event.commitment_id, []).append(event)
+            refs = event.question_refs
+            if refs:
+                # 通常は全件既知のため、未知参照の一覧はエラー時にのみ作る
+                for ref in refs:
+                    if ref not in question_index:
+                        unknown = [r for r in refs if r not in question_index]
+                        raise ValueError(
+                            f"Utterance turn {event.turn} references unknown questions: {unknown}"
+                        )
+        self._commitments = bucket
+        return True
 
     def open_question_index(self) -> Dict[str, OpenQuestion]:
-        return {q.question_id: q for q in self.open_questions or []}
+        return self._question_index
 
     def unresolved_questions(self) -> List[OpenQuestion]:
-        return [q for q in self.open_questions or [] if q.status == QuestionStatus.OPEN]
+        return [q for q in self._question_index.values() if q.status == QuestionStatus.OPEN]
 
     def commitments(self) -> Dict[str, List[UtteranceEvent]]:
-        bucket: Dict[str, List[UtteranceEvent]] = {}
-        for event in self.utterances:
-            if event.commitment_id:
-                bucket.setdefault(event.commitment_id, []).append(event)
-        return bucket
+        return self._commitments
 
     def unique_speakers(self) -> List[str]:
         if self.participants:
             return self.participants
-        seen: Dict[str, None] = {}
-        for event in self.utterances:
-            seen.setdefault(event.speaker, None)
-        return list(seen.keys())
+        if self._speakers is None:
+            # dict.fromkeys は初出順を保ったまま C 実装で重複を除く
+            self._speakers = list(dict.fromkeys(event.speaker for event in self.utterances))
+        return self._speakers
+
+
+def load_meeting_json(raw: Union[bytes, str]) -> MeetingRecord:
+    """会議JSONを検証しながら読み込む (推奨ローダ)。
+
+    json.loads → model_validate と異なり中間 dict を作らず、pydantic-core がパースと検証を1パスで行う。
+    ファイルからは read_bytes() の結果をそのまま渡す。
+    """
+    return MeetingRecord.model_validate_json(raw)
 
 
 class ConstraintViolation(BaseModel):
@@ -190,19 +286,21 @@ class ConstraintSummary(BaseModel):
     cp_status: Dict[str, str]
 
 
+_ACT_TO_STATE: Dict[str, CommitmentStateEnum] = {
+    "ASSIGN": CommitmentStateEnum.ASSIGNED_PENDING,
+    "CONFIRM": CommitmentStateEnum.CONFIRMED,
+    "REVISE": CommitmentStateEnum.REVISED_PENDING,
+    "CANCEL": CommitmentStateEnum.CANCELLED,
+}
+
+
 def iter_commitment_states(events: List[UtteranceEvent]) -> List[CommitmentStateEnum]:
-    """簡易ステートマシンで状態遷移ログを返す。"""
-    states: List[CommitmentStateEnum] = [CommitmentStateEnum.UNASSIGNED]
+    """簡易ステートマシンで状態遷移ログを返す。OTHER では状態を維持する。"""
     current = CommitmentStateEnum.UNASSIGNED
+    states: List[CommitmentStateEnum] = [current]
+    append = states.append
+    next_state = _ACT_TO_STATE.get
     for event in events:
-        if event.act == "ASSIGN":
-            current = CommitmentStateEnum.ASSIGNED_PENDING
-        elif event.act == "CONFIRM":
-            current = CommitmentStateEnum.CONFIRMED
-        elif event.act == "REVISE":
-            current = CommitmentStateEnum.REVISED_PENDING
-        elif event.act == "CANCEL":
-            current = CommitmentStateEnum.CANCELLED
-        states.append(current)
+        current = next_state(event.act, current)
+        append(current)
     return states
-
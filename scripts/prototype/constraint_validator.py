@@ -2,22 +2,15 @@
 """C2-Graph コミットメント制約バリデータ (MVP)。
 
 - 会議JSONを読み込み、Pydanticで構造を検証
-- OR-Tools CP-SAT が利用可能なら遷移制約を充足可能性チェック
+- 遷移表 (ALLOWED_TRANSITIONS) に沿う状態列が存在するかで遷移制約の充足可能性をチェック
 - 手続き的なルールで権限違反や重複キャンセル等を検出
 - Markdown/JSON の簡易レポートを生成
 """
 from __future__ import annotations
 
-import argparse
-import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
-
-try:
-    from ortools.sat.python import cp_model
-except ImportError:  # OR-Tools がない場合は None を保持
-    cp_model = None
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
 
 try:
     from scripts.prototype.c2_models import (
@@ -26,7 +19,7 @@ try:
         ConstraintViolation,
         MeetingRecord,
         UtteranceEvent,
-        iter_commitment_states,
+        load_meeting_json,
     )
 except ModuleNotFoundError:
     import sys
@@ -39,7 +32,7 @@ except ModuleNotFoundError:
         ConstraintViolation,
         MeetingRecord,
         UtteranceEvent,
-        iter_commitment_states,
+        load_meeting_json,
     )
 
 
@@ -64,19 +57,39 @@ ALLOWED_TRANSITIONS: Dict[str, Sequence[Tuple[CommitmentStateEnum, CommitmentSta
     ),
 }
 
+# 状態値 (int) → 状態。Enum(value) の呼び出しを避けるため値 (0 始まりの連番) で直接引く
+_STATE_BY_VALUE: Tuple[CommitmentStateEnum, ...] = tuple(CommitmentStateEnum)
+# レポート用の状態名。Enum の .name はプロパティ経由で遅いため、値 (連番) で引ける形にしておく
+_STATE_NAME_BY_VALUE: Tuple[str, ...] = tuple(state.name for state in CommitmentStateEnum)
+
+# ルールチェック用に、遷移を int の組の frozenset として事前計算する。
+# Enum メンバのハッシュは名前から計算されるため、int と混在させず値で統一する
+_ALLOWED_INT: Dict[str, FrozenSet[Tuple[int, int]]] = {
+    act: frozenset((prev.value, nxt.value) for prev, nxt in transitions)
+    for act, transitions in ALLOWED_TRANSITIONS.items()
+}
+_NEXT_STATE: Dict[str, int] = {
+    "ASSIGN": CommitmentStateEnum.ASSIGNED_PENDING.value,
+    "CONFIRM": CommitmentStateEnum.CONFIRMED.value,
+    "REVISE": CommitmentStateEnum.REVISED_PENDING.value,
+    "CANCEL": CommitmentStateEnum.CANCELLED.value,
+}
+_UNASSIGNED = CommitmentStateEnum.UNASSIGNED.value
+_CANCELLED = CommitmentStateEnum.CANCELLED.value
+
 
-@dataclass
+@dataclass(slots=True)
 class CommitmentContext:
     commitment_id: str
     owner: Optional[str] = None
     due: Optional[str] = None
-    state: CommitmentStateEnum = CommitmentStateEnum.UNASSIGNED
+    state: int = _UNASSIGNED  # CommitmentStateEnum の値
     requires_confirmation: bool = False
 
 
 class ConstraintValidator:
     def __init__(self, enable_cp: bool = True) -> None:
-        self.enable_cp = enable_cp and cp_model is not None
+        self.enable_cp = enable_cp
 
     def validate(self, meeting: MeetingRecord) -> ConstraintSummary:
         violations: List[ConstraintViolation] = []
@@ -86,25 +99,27 @@ class ConstraintValidator:
 
         for cid, events in meeting.commitments().items():
             context = CommitmentContext(commitment_id=cid)
-            stages[cid] = iter_commitment_states(events)
-            violations.extend(self._validate_commitment(context, events))
+            # 状態列はルールチェックと同じ走査で記録する (iter_commitment_states と同じ結果)
+            stages[cid] = states = []
+            commitment_violations = self._validate_commitment(context, events, states)
+            violations.extend(commitment_violations)
 
             cp_status = "SKIPPED"
-            cp_states = None
             if self.enable_cp:
-                cp_status, cp_states = self._run_cp(events)
-                if cp_status == "INFEASIBLE":
+                # act ごとの遷移先は一意のため、遷移制約を満たす状態列はルールチェックで記録した
+                # 状態列ただ1つで、invalid_transition が無いことと充足可能であることは同値
+                has_invalid = any(v.violation_type == "invalid_transition" for v in commitment_violations)
+                cp_status = "INFEASIBLE" if has_invalid else "FEASIBLE"
+                if has_invalid:
                     violations.append(
                         ConstraintViolation(
                             commitment_id=cid,
                             turn=events[0].turn,
                             violation_type="cp_infeasible_transition",
-                            description="OR-Tools による遷移制約が充足不能",
+                            description="遷移制約を満たす状態列が存在しない",
                             speaker=None,
                         )
                     )
-                elif cp_status == "FEASIBLE" and cp_states is not None:
-                    stages[cid] = [CommitmentStateEnum(value) for value in cp_states]
             cp_status_map[cid] = cp_status
 
         summary = ConstraintSummary(
@@ -118,32 +133,42 @@ class ConstraintValidator:
         return summary
 
     def _validate_commitment(
-        self, context: CommitmentContext, events: List[UtteranceEvent]
+        self,
+        context: CommitmentContext,
+        events: List[UtteranceEvent],
+        states: List[CommitmentStateEnum],
     ) -> List[ConstraintViolation]:
+        """ルールチェックを行い、各イベント後の状態を初期状態から順に states へ追記する。"""
         violations: List[ConstraintViolation] = []
+        record_state = states.append
+        record_state(_STATE_BY_VALUE[context.state])
 
         for event in events:
-            allowed = ALLOWED_TRANSITIONS.get(event.act, ())
-            transition = (context.state, self._next_state(event))
+            act = event.act
+            allowed = _ALLOWED_INT.get(act)
+            if allowed is None:
+                # OTHER などは状態を変えない
+                record_state(_STATE_BY_VALUE[context.state])
+                continue
+            next_state = _NEXT_STATE[act]
 
-            if allowed and transition not in allowed:
+            if (context.state, next_state) not in allowed:
                 violations.append(
                     ConstraintViolation(
                         commitment_id=context.commitment_id,
                         turn=event.turn,
                         violation_type="invalid_transition",
-                        description=f"{context.state.name} から {event.act} は許可されていない遷移",
+                        description=f"{_STATE_BY_VALUE[context.state].name} から {act} は許可されていない遷移",
                         speaker=event.speaker,
                     )
                 )
 
-            if event.act == "ASSIGN":
+            if act == "ASSIGN":
                 context.owner = event.owner or context.owner
                 context.due = event.due or context.due
                 context.requires_confirmation = True
-                context.state = CommitmentStateEnum.ASSIGNED_PENDING
-            elif event.act == "CONFIRM":
-                if context.state == CommitmentStateEnum.UNASSIGNED:
+            elif act == "CONFIRM":
+                if context.state == _UNASSIGNED:
                     violations.append(
                         ConstraintViolation(
                             commitment_id=context.commitment_id,
@@ -155,9 +180,8 @@ class ConstraintValidator:
                     )
                 context.owner = context.owner or event.owner or event.speaker
                 context.requires_confirmation = False
-                context.state = CommitmentStateEnum.CONFIRMED
-            elif event.act == "REVISE":
-                if context.state == CommitmentStateEnum.UNASSIGNED:
+            elif act == "REVISE":
+                if context.state == _UNASSIGNED:
                     violations.append(
                         ConstraintViolation(
                             commitment_id=context.commitment_id,
@@ -172,32 +196,21 @@ class ConstraintValidator:
                 if event.new_due:
                     context.due = event.new_due
                 context.requires_confirmation = True
-                context.state = CommitmentStateEnum.REVISED_PENDING
-            elif event.act == "CANCEL":
+            else:  # CANCEL
                 self._validate_cancel(context, event, violations)
                 context.requires_confirmation = False
-                context.state = CommitmentStateEnum.CANCELLED
+            context.state = next_state
+            record_state(_STATE_BY_VALUE[next_state])
 
         return violations
 
-    def _next_state(self, event: UtteranceEvent) -> CommitmentStateEnum:
-        if event.act == "ASSIGN":
-            return CommitmentStateEnum.ASSIGNED_PENDING
-        if event.act == "CONFIRM":
-            return CommitmentStateEnum.CONFIRMED
-        if event.act == "REVISE":
-            return CommitmentStateEnum.REVISED_PENDING
-        if event.act == "CANCEL":
-            return CommitmentStateEnum.CANCELLED
-        return CommitmentStateEnum.UNASSIGNED
-
     def _validate_cancel(
         self,
         context: CommitmentContext,
         event: UtteranceEvent,
         violations: List[ConstraintViolation],
     ) -> None:
-        if context.state == CommitmentStateEnum.UNASSIGNED:
+        if context.state == _UNASSIGNED:
             violations.append(
                 ConstraintViolation(
                     commitment_id=context.commitment_id,
@@ -217,7 +230,7 @@ class ConstraintValidator:
                     speaker=event.speaker,
                 )
             )
-        if context.state == CommitmentStateEnum.CANCELLED:
+        if context.state == _CANCELLED:
             violations.append(
                 ConstraintViolation(
                     commitment_id=context.commitment_id,
@@ -238,64 +251,48 @@ class ConstraintValidator:
                 )
             )
 
-    def _run_cp(
-        self, events: List[UtteranceEvent]
-    ) -> Tuple[str, Optional[List[int]]]:
-        if cp_model is None or not events:
-            return "SKIPPED", None
-
-        model = cp_model.CpModel()
-        state_vars = [model.NewIntVar(0, 4, f"state_{idx}") for idx in range(len(events) + 1)]
-        model.Add(state_vars[0] == CommitmentStateEnum.UNASSIGNED.value)
-
-        for idx, event in enumerate(events):
-            allowed = ALLOWED_TRANSITIONS.get(event.act, ())
-            if not allowed:
-                # OTHER などは前後状態が変わらないとみなす
-                model.Add(state_vars[idx + 1] == state_vars[idx])
-                continue
-            tuples = [(prev.value, nxt.value) for prev, nxt in allowed]
-            model.AddAllowedAssignments([state_vars[idx], state_vars[idx + 1]], tuples)
-
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 1.0
-        status = solver.Solve(model)
 
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            return "FEASIBLE", [int(solver.Value(var)) for var in state_vars]
-        if status == cp_model.INFEASIBLE:
-            return "INFEASIBLE", None
-        return "UNKNOWN", None
-
-
-def render_markdown(summary: ConstraintSummary) -> str:
-    lines: List[str] = []
-    lines.append(f"会議ID: {summary.meeting_id}")
-    lines.append("")
-    lines.append("## コミットメント状態シーケンス")
+def _render_markdown_lines(summary: ConstraintSummary) -> Iterator[str]:
+    state_name = _STATE_NAME_BY_VALUE.__getitem__
+    cp_status = summary.cp_status
+    yield f"会議ID: {summary.meeting_id}"
+    yield ""
+    yield "## コミットメント状態シーケンス"
     for cid, states in summary.stages.items():
-        state_labels = ", ".join(state.name for state in states)
-        cp_status = summary.cp_status.get(cid, "SKIPPED")
-        lines.append(f"- {cid} (CP: {cp_status}): {state_labels}")
-    lines.append("")
-    lines.append("## 検出された違反")
+        state_labels = ", ".join(map(state_name, states))
+        yield f"- {cid} (CP: {cp_status.get(cid, 'SKIPPED')}): {state_labels}"
+    yield ""
+    yield "## 検出された違反"
     if not summary.violations:
-        lines.append("- 違反なし")
+        yield "- 違反なし"
     else:
         for violation in summary.violations:
             speaker = f" (話者: {violation.speaker})" if violation.speaker else ""
-            lines.append(
+            yield (
                 f"- turn{violation.turn} {violation.commitment_id}: {violation.violation_type}"
                 f" | {violation.description}{speaker}"
             )
-    lines.append("")
-    lines.append(
-        f"違反件数: {summary.violation_count} / コミットメント総数: {summary.total_commitments}"
-    )
-    return "\n".join(lines)
+    yield ""
+    yield f"違反件数: {summary.violation_count} / コミットメント総数: {summary.total_commitments}"
+
+
+def render_markdown(summary: ConstraintSummary) -> str:
+    return "\n".join(_render_markdown_lines(summary))
+
+
+def run(meeting: MeetingRecord, enable_cp: bool = True) -> ConstraintSummary:
+    """読み込み済みの会議を検証する (ライブラリ用の入口)。
+
+    辞書で保持している場合は MeetingRecord.model_validate、JSON の bytes なら
+    load_meeting_json を通してから渡す。ファイルへの書き出しや argparse を経由しない。
+    """
+    return ConstraintValidator(enable_cp=enable_cp).validate(meeting)
 
 
 def main() -> None:
+    # argparse の import は CLI 実行時のみ (ライブラリとして import する場合の起動コストを避ける)
+    import argparse
+
     parser = argparse.ArgumentParser(description="C2-Graph 制約バリデータ")
     parser.add_argument("input", type=Path, help="会議JSONファイル")
     parser.add_argument(
@@ -306,15 +303,13 @@ def main() -> None:
     parser.add_argument(
         "--no-cp",
         action="store_true",
-        help="CP-SAT を使用せず、ルールチェックのみ実施",
+        help="遷移制約の充足可能性チェックを行わず、ルールチェックのみ実施",
     )
     args = parser.parse_args()
 
-    data = json.loads(args.input.read_text(encoding="utf-8"))
-    meeting = MeetingRecord.model_validate(data)
+    meeting = load_meeting_json(args.input.read_bytes())
 
-    validator = ConstraintValidator(enable_cp=not args.no_cp)
-    summary = validator.validate(meeting)
+    summary = run(meeting, enable_cp=not args.no_cp)
 
     markdown = render_markdown(summary)
     print(markdown)